@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CACHE_SIZE = 64
+
+"""
+Shape-preserving Downsampling
+"""
+def minmax_buckets(y, n_buckets):
+    """
+    Indices of first/last point plus min and max of each bucket (vectorized)
+    """
+    n = len(y)
+    if 2*n_buckets >= n:
+        return np.arange(n)
+    width = -(-n // n_buckets)
+    n_buckets = -(-n // width)
+    pad = n_buckets*width - n
+    lows = np.concatenate([y, np.full(pad, np.inf)]).reshape(n_buckets, width)
+    highs = np.concatenate([y, np.full(pad, -np.inf)]).reshape(n_buckets, width)
+    offsets = width*np.arange(n_buckets)
+    idx = np.concatenate([
+        [0, n - 1],
+        offsets + lows.argmin(axis=1),
+        offsets + highs.argmax(axis=1)
+    ])
+    return np.unique(idx)
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets (Steinarsson). Indices of the kept points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x)*(y[lo:hi] - y[a]) - (x[a] - x[lo:hi])*(avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+def downsample(series, n_out, method="minmax"):
+    """
+    Series reduced to ~n_out points (minmax keeps up to 2 per bucket)
+    """
+    series = series.dropna()
+    y = series.to_numpy(dtype=float)
+    if method == "lttb":
+        x = series.index.asi8.astype(float) if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(y), dtype=float)
+        idx = lttb(x, y, n_out)
+    else:
+        idx = minmax_buckets(y, max(n_out//2, 1))
+    return series.iloc[idx]
+
+"""
+Matplotlib Helpers (pyplot-free figures, safe to keep in a cache)
+"""
+def new_figure(figsize=None, dpi=None):
+    """
+    Build it at the size and dpi it is rendered at, so `plot_lines` downsamples
+    to the pixels actually drawn
+    """
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=dpi)
+    return fig, fig.subplots()
+
+def width_px(ax):
+    return int(ax.figure.get_figwidth()*ax.figure.dpi*ax.get_position().width)
+
+def plot_lines(ax, data, method="minmax", **kwargs):
+    """
+    ax.plot(data) drop-in: each column (or the Series) downsampled to the axes pixel width
+    """
+    n_out = width_px(ax)
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    for col in frame.columns:
+        ds = downsample(frame[col], n_out, method)
+        ax.plot(ds.index, ds.to_numpy(), **kwargs)
+
+def style_wealth_axis(ax):
+    from matplotlib.dates import DateFormatter
+    ax.tick_params(axis="x", rotation=45)
+    ax.xaxis.set_major_formatter(DateFormatter('%Y-%b'))
+    ax.set_ylabel("Cumulative Wealth (€)")
+    ax.grid(visible=True, axis='y')
+
+def figure_png(fig, dpi=None):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+"""
+Rendered Figures Cache
+"""
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def cached_render(key, draw, maxsize=CACHE_SIZE):
+    """
+    LRU cache of rendered charts, e.g. key=(chart, symbols, start, end, scheme, target_vol)
+    """
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = draw()
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > maxsize:
+            _cache.popitem(last=False)
+    return value
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+DEFAULT_DB = "finance_market_data_db"
+DEFAULT_TABLE = "fx_prices"
+CHUNKSIZE = 50_000
+
+"""
+Connection Related Functions
+"""
+def engine_url(secrets_file="./secrets.json", host="raspi4", db=DEFAULT_DB, driver="pymysql"):
+    """
+    MySQL URL built from the `sql_authentication` block of secrets.json
+    """
+    with open(secrets_file, "r") as f:
+        secrets = json.load(f)["sql_authentication"]
+    return f"mysql+{driver}://{secrets['username']}:{secrets['password']}@{host}/{db}"
+
+@lru_cache(maxsize=None)
+def get_engine(url):
+    """
+    One pooled engine per URL (e.g. "sqlite:///fx.db" for local testing)
+    """
+    return create_engine(url, pool_pre_ping=True)
+
+def _as_engine(con):
+    return get_engine(con) if isinstance(con, str) else con
+
+"""
+Predicate Pushdown
+"""
+def _where_clauses(start=None, end=None, codes=None):
+    clauses, params = [], {}
+    if start is not None:
+        clauses.append("date >= :start")
+        params["start"] = pd.Timestamp(start).strftime("%Y-%m-%d")
+    if end is not None:
+        # exclusive next day: `to_sql` from a datetime column stores 'YYYY-MM-DD 00:00:00'
+        clauses.append("date < :end")
+        params["end"] = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    if codes is not None:
+        names = [f"code_{i}" for i in range(len(codes))]
+        clauses.append("code IN (" + ", ".join(":" + n for n in names) + ")")
+        params.update(zip(names, codes))
+    return clauses, params
+
+"""
+Readers
+"""
+def read_fx_tidy_chunks(con, start=None, end=None, codes=None, table=DEFAULT_TABLE, chunksize=CHUNKSIZE):
+    """
+    (date, code, price) rows ordered by (date, code), in keyset-paginated pages.
+
+    Each page is a bounded `ORDER BY date, code LIMIT n` query, so client memory
+    stays at one page whatever the driver does. (Of the MySQL drivers, only
+    pymysql/mysqldb stream with `stream_results`; mysqlconnector always buffers
+    the full result set.) Pages are range scans on the (date, code) index created
+    in the fx_prices load path (fx_data_sql_handler.ipynb, `code` as VARCHAR(3)).
+    """
+    if codes is not None:
+        codes = list(codes)
+        if not codes:
+            return
+    clauses, params = _where_clauses(start, end, codes)
+    last = None
+    with _as_engine(con).connect() as conn:
+        while True:
+            page = clauses + (["(date, code) > (:last_date, :last_code)"] if last else [])
+            where = (" WHERE " + " AND ".join(page)) if page else ""
+            sql = text(f"SELECT date, code, price FROM {table}{where} ORDER BY date, code LIMIT {int(chunksize)}")
+            if last:
+                params.update(last_date=last[0], last_code=last[1])
+            rows = conn.execute(sql, params).fetchall()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunksize:
+                return
+            last = rows[-1]
+
+def read_fx_prices(con, start=None, end=None, codes=None, table=DEFAULT_TABLE, chunksize=CHUNKSIZE):
+    """
+    Wide date x code float32 price matrix in a single scan. Replaces read_sql + pivot.
+
+    Rows arrive ordered by date, so date breaks are found with numpy and only
+    (row, col, price) triples are kept until the matrix is allocated.
+    """
+    dates, code_idx = [], {}
+    rows_i, cols_j, prices = [], [], []
+    prev_date, n_dates = None, 0
+
+    for rows in read_fx_tidy_chunks(con, start, end, codes, table, chunksize):
+        page_dates, page_codes, page_prices = zip(*rows)
+        d = np.array(page_dates, dtype=object)
+        breaks = np.empty(len(d), dtype=bool)
+        breaks[0] = d[0] != prev_date
+        breaks[1:] = d[1:] != d[:-1]
+        dates.extend(d[breaks])
+        rows_i.append(n_dates - 1 + np.cumsum(breaks))
+        n_dates += int(breaks.sum())
+        prev_date = d[-1]
+
+        uniques, inverse = np.unique(np.array(page_codes, dtype=object), return_inverse=True)
+        for code in uniques:
+            code_idx.setdefault(code, len(code_idx))
+        cols_j.append(np.array([code_idx[code] for code in uniques], dtype=np.intp)[inverse])
+        prices.append(np.array(page_prices, dtype=np.float32)) # NULL -> nan
+
+    symbols = sorted(code_idx)
+    matrix = np.full((n_dates, len(symbols)), np.nan, dtype=np.float32)
+    if n_dates:
+        matrix[np.concatenate(rows_i), np.concatenate(cols_j)] = np.concatenate(prices)
+        matrix = matrix[:, [code_idx[code] for code in symbols]]
+
+    return pd.DataFrame(
+        matrix,
+        index=pd.DatetimeIndex(pd.to_datetime(pd.Series(dates, dtype=object)), name="date"),
+        columns=pd.Index(symbols, name="code")
+    )
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+import numpy as np
+from sklearn.linear_model import enet_path
+from sklearn.model_selection import check_cv
+
+"""
+Gram Matrices (one pass over the rows per fold)
+
+Design A = [1, X, y] (globally centered for conditioning). With G = A'A every
+LinearRegression fit/score on a feature subset only needs sub-blocks of G,
+so no fit ever touches the rows again.
+"""
+def fold_grams(X, y, cv=5):
+    """
+    List of (G_train, G_val) per fold. `cv` as in sklearn (int -> unshuffled KFold,
+    or a splitter/iterable such as TimeSeriesSplit for walk-forward folds)
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float).ravel()
+    A = np.column_stack([np.ones(len(y)), X - X.mean(axis=0), y - y.mean()])
+    splits = list(check_cv(cv).split(X, y))
+    complementary = all(len(train) + len(val) == len(y) for train, val in splits)
+    G = A.T @ A if complementary else None
+    grams = []
+    for train, val in splits:
+        G_val = A[val].T @ A[val]
+        G_train = G - G_val if complementary else A[train].T @ A[train]
+        grams.append((G_train, G_val))
+    return grams
+
+def _subset_r2(grams, subsets):
+    """
+    Fold-wise R^2 of LinearRegression for a batch of subsets (C, k) of feature columns.
+    Returns (n_folds, C).
+    """
+    subsets = np.asarray(subsets, dtype=np.intp)
+    idx = np.column_stack([np.zeros(len(subsets), dtype=np.intp), subsets + 1]) # intercept first
+    scores = []
+    for G_train, G_val in grams:
+        yi = G_train.shape[0] - 1
+        lhs = G_train[idx[:, :, None], idx[:, None, :]]
+        rhs = G_train[idx, yi]
+        beta = np.einsum("cij,cj->ci", np.linalg.pinv(lhs, rcond=1e-12, hermitian=True), rhs)
+        sse = (
+            G_val[yi, yi]
+            - 2*np.einsum("ci,ci->c", beta, G_val[idx, yi])
+            + np.einsum("ci,cij,cj->c", beta, G_val[idx[:, :, None], idx[:, None, :]], beta)
+        )
+        sst = G_val[yi, yi] - G_val[0, yi]**2/G_val[0, 0]
+        scores.append(1 - sse/sst)
+    return np.array(scores)
+
+"""
+Stepwise Selection (SequentialFeatureSelector drop-in for LinearRegression + r2)
+"""
+def cv_scores(X, y, support, cv=5, grams=None):
+    """
+    Same as cross_val_score(LinearRegression(), X[:, support], y, cv=cv, scoring="r2")
+    """
+    grams = fold_grams(X, y, cv) if grams is None else grams
+    return _subset_r2(grams, [np.flatnonzero(support)])[:, 0]
+
+def _forward_r2(grams, current, candidates):
+    """
+    Fold-wise R^2 of current + each candidate by bordering the current inverse
+    (rank-one Schur complement update). Returns (n_folds, C).
+    """
+    S = np.concatenate([[0], current + 1])
+    c = candidates + 1
+    scores = []
+    for G_train, G_val in grams:
+        yi = G_train.shape[0] - 1
+        M = np.linalg.pinv(G_train[np.ix_(S, S)], rcond=1e-12, hermitian=True)
+        beta = M @ G_train[S, yi]
+        U = G_train[np.ix_(S, c)]
+        V = M @ U
+        schur = G_train[c, c] - np.einsum("kc,kc->c", U, V)
+        # collinear candidates (null Schur complement) add nothing, as with lstsq
+        ok = schur > 1e-12*G_train[c, c]
+        r = np.where(ok, (G_train[c, yi] - U.T @ beta)/np.where(ok, schur, 1), 0)
+        B = beta[:, None] - V*r # (k, C)
+        Gv_SS, Gv_Sc = G_val[np.ix_(S, S)], G_val[np.ix_(S, c)]
+        sse = (
+            G_val[yi, yi]
+            - 2*(B.T @ G_val[S, yi] + r*G_val[c, yi])
+            + np.einsum("kc,kl,lc->c", B, Gv_SS, B) + 2*r*np.einsum("kc,kc->c", B, Gv_Sc) + r**2*G_val[c, c]
+        )
+        sst = G_val[yi, yi] - G_val[0, yi]**2/G_val[0, 0]
+        scores.append(1 - sse/sst)
+    return np.array(scores)
+
+def _backward_r2(grams, current):
+    """
+    Fold-wise R^2 of current minus each feature by rank-one downdates of the
+    current inverse. Returns (n_folds, len(current)).
+    """
+    S = np.concatenate([[0], current + 1])
+    scores = []
+    for G_train, G_val in grams:
+        yi = G_train.shape[0] - 1
+        G_SS = G_train[np.ix_(S, S)]
+        eig = np.linalg.eigvalsh(G_SS)
+        if eig[0] <= 1e-12*eig[-1]: # rank deficient: downdates are not exact
+            subsets = np.array([current[current != f] for f in current]).reshape(len(current), -1)
+            scores.append(_subset_r2([(G_train, G_val)], subsets)[0])
+            continue
+        M = np.linalg.inv(G_SS)
+        beta = M @ G_train[S, yi]
+        J = np.arange(1, len(S))
+        B = beta[:, None] - M[:, J]*(beta[J]/M[J, J]) # (k, C), B[J[i], i] == 0
+        sse = (
+            G_val[yi, yi]
+            - 2*B.T @ G_val[S, yi]
+            + np.einsum("kc,kl,lc->c", B, G_val[np.ix_(S, S)], B)
+        )
+        sst = G_val[yi, yi] - G_val[0, yi]**2/G_val[0, 0]
+        scores.append(1 - sse/sst)
+    return np.array(scores)
+
+def stepwise_select(X, y, n_features_to_select=10, direction="forward", cv=5, grams=None):
+    """
+    Greedy forward/backward selection on mean fold R^2.
+    Returns (support mask, fold-wise R^2 of the selected subset).
+    """
+    grams = fold_grams(X, y, cv) if grams is None else grams
+    n_features = grams[0][0].shape[0] - 2
+    support = np.zeros(n_features, dtype=bool) if direction == "forward" else np.ones(n_features, dtype=bool)
+    n_steps = n_features_to_select if direction == "forward" else n_features - n_features_to_select
+
+    for _ in range(n_steps):
+        current = np.flatnonzero(support)
+        if direction == "forward":
+            candidates = np.flatnonzero(~support)
+            best = candidates[_forward_r2(grams, current, candidates).mean(axis=0).argmax()]
+            support[best] = True
+        else:
+            best = current[_backward_r2(grams, current).mean(axis=0).argmax()]
+            support[best] = False
+
+    return support, _subset_r2(grams, [np.flatnonzero(support)])[:, 0]
+
+"""
+ElasticNet Paths on Precomputed Gram
+"""
+def enet_path_scores(X, y, l1_ratio=0.5, alphas=None, n_alphas=100, eps=1e-3, cv=5, grams=None):
+    """
+    Fold-wise R^2 along a common ElasticNet alpha grid.
+    Returns (alphas, scores (n_folds, n_alphas), coefs (n_folds, n_features, n_alphas)).
+
+    `grams`, if given, must come from fold_grams(X, y, cv) with the same `cv`.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float).ravel()
+    splits = list(check_cv(cv).split(X, y))
+    grams = fold_grams(X, y, splits) if grams is None else grams
+    yi = grams[0][0].shape[0] - 1
+
+    folds = []
+    for (train, _), (G_train, _) in zip(splits, grams):
+        n = G_train[0, 0]
+        mean = G_train[0, 1:]/n
+        C = G_train[1:, 1:] - n*np.outer(mean, mean) # centered [X, y] cross-products
+        folds.append((train, n, mean, np.ascontiguousarray(C[:-1, :-1]), np.ascontiguousarray(C[:-1, -1])))
+
+    if alphas is None:
+        # common grid from the largest per-fold alpha_max: every fold starts at the null model
+        alpha_max = max(np.abs(xy).max()/(n*l1_ratio) for _, n, _, _, xy in folds)
+        alphas = np.geomspace(alpha_max, alpha_max*eps, n_alphas)
+
+    scores, coefs = [], []
+    for (train, n, mean, gram, xy), (_, G_val) in zip(folds, grams):
+        # centered fold rows, consistent with the precomputed Gram and Xy
+        X_train = np.asfortranarray(X[train] - X[train].mean(axis=0))
+        y_train = y[train] - y[train].mean()
+        _, coef, _ = enet_path(
+            X_train, y_train,
+            l1_ratio=l1_ratio, alphas=alphas, precompute=gram, Xy=xy, check_input=False
+        )
+        intercept = mean[-1] - mean[:-1] @ coef
+        beta = np.vstack([intercept, coef]) # (1 + p, n_alphas)
+        idx = np.arange(yi)
+        sse = (
+            G_val[yi, yi]
+            - 2*beta.T @ G_val[idx, yi]
+            + np.einsum("ia,ij,ja->a", beta, G_val[:yi, :yi], beta)
+        )
+        sst = G_val[yi, yi] - G_val[0, yi]**2/G_val[0, 0]
+        scores.append(1 - sse/sst)
+        coefs.append(coef)
+    return alphas, np.array(scores), np.array(coefs)
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
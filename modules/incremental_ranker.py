@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+import time
+
+import joblib
+import lightgbm
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import RobustScaler
+
+from modules.ranking_service import ABNORMAL_PMS, NON_FEATURES, save_artifacts
+
+LABEL = "observed_rank"
+
+# LambdaMART notebook set-up
+BASE_PARAMS = {
+    "n_estimators": 15000,
+    "random_state": 42,
+    "num_leaves": 41,
+    "learning_rate": 0.002,
+    "max_bin": 20,
+    "subsample_for_bin": 20000,
+    "colsample_bytree": 0.7,
+    "n_jobs": 6
+}
+
+"""
+Query Groups, NDCG and Drift
+"""
+def query_groups(frame):
+    """
+    Cross-section sizes of a Date-sorted tidy frame (LGBMRanker `group`)
+    """
+    return frame.groupby(level=0, sort=False).size().to_numpy()
+
+def ndcg_at_k(y, scores, group, k=4):
+    """
+    Mean NDCG@k over query groups (LightGBM convention: 2^rel - 1 gains,
+    groups without relevant items count as 1)
+    """
+    discounts = 1/np.log2(np.arange(2, k + 2))
+    ndcgs, start = [], 0
+    for size in group:
+        rel = np.asarray(y[start:start + size], dtype=float)
+        s = np.asarray(scores[start:start + size])
+        start += size
+        ideal = ((2**np.sort(rel)[::-1][:k] - 1)*discounts[:min(k, size)]).sum()
+        if ideal == 0:
+            ndcgs.append(1.0)
+            continue
+        dcg = ((2**rel[np.argsort(-s, kind="stable")][:k] - 1)*discounts[:min(k, size)]).sum()
+        ndcgs.append(dcg/ideal)
+    return float(np.mean(ndcgs))
+
+def reference_bins(X, n_bins=10):
+    """
+    Per-feature decile edges of the training features (drift reference)
+    """
+    return np.nanquantile(X, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0).T
+
+def psi(X, edges, eps=1e-4):
+    """
+    Population Stability Index per feature of X against reference decile edges
+    """
+    expected = 1/(edges.shape[1] + 1)
+    out = np.empty(X.shape[1])
+    for j in range(X.shape[1]):
+        counts = np.bincount(np.searchsorted(edges[j], X[:, j], side="right"), minlength=edges.shape[1] + 1)
+        actual = np.clip(counts/counts.sum(), eps, None)
+        out[j] = ((actual - expected)*np.log(actual/expected)).sum()
+    return out
+
+"""
+Full Refit and Warm-Start Retraining
+"""
+def _rolling_split(data, start_after, val_dates):
+    # rolling validation window = last `val_dates` cross-sections (trained on at the next update)
+    dates = data.index.unique().sort_values()
+    val_start = dates[-val_dates]
+    train = data[data.index < val_start]
+    if start_after is not None:
+        train = train[train.index > start_after]
+    return train, data[data.index >= val_start]
+
+def _fit(ranker, X, y, group, X_val, y_val, group_val, eval_at, stopping_rounds, init_model=None):
+    ranker.fit(
+        X, y,
+        group=group,
+        eval_set=[(X_val, y_val)],
+        eval_group=[group_val],
+        eval_at=[eval_at],
+        init_model=init_model,
+        callbacks=[lightgbm.early_stopping(stopping_rounds, verbose=False)]
+    )
+    return ranker
+
+def full_refit(data, path, params=None, val_dates=21, eval_at=4, stopping_rounds=500):
+    """
+    Fits scaler and LGBMRanker on the whole history (but the validation window)
+    and saves the bundle with the state needed by `retrain`.
+    """
+    tic = time.perf_counter()
+    data = data.sort_index()
+    params = dict(BASE_PARAMS if params is None else params)
+    feature_names = [col for col in data.columns if col not in NON_FEATURES + ABNORMAL_PMS]
+    train, val = _rolling_split(data, None, val_dates)
+
+    scaler = RobustScaler()
+    X_train = scaler.fit_transform(train[feature_names].to_numpy())
+    X_val = scaler.transform(val[feature_names].to_numpy())
+    ranker = _fit(
+        lightgbm.LGBMRanker(**params),
+        X_train, train[LABEL].astype(int), query_groups(train),
+        X_val, val[LABEL].astype(int), query_groups(val),
+        eval_at, stopping_rounds
+    )
+    ndcg = ndcg_at_k(val[LABEL].to_numpy(), ranker.predict(X_val), query_groups(val), eval_at)
+    save_artifacts(
+        ranker, scaler, path,
+        feature_names=feature_names,
+        params=params,
+        reference=reference_bins(X_train),
+        last_trained_date=train.index[-1]
+    )
+    return {"mode": "full", "ndcg": ndcg, "trees": ranker.booster_.num_trees(), "seconds": time.perf_counter() - tic}
+
+def retrain(data, path, val_dates=21, max_new_trees=2000, eval_at=4, stopping_rounds=100, drift_threshold=0.25,
+            max_unchanged=3):
+    """
+    Monthly update. Continues boosting the saved ranker on the query groups
+    appended since its last training date, adding trees only while NDCG@eval_at
+    on the rolling validation window improves. Falls back to `full_refit` when
+    the mean PSI of every row after the last training date (validation window
+    included) against the training reference exceeds `drift_threshold`, or
+    after `max_unchanged` consecutive updates where the warm start did not win.
+    """
+    tic = time.perf_counter()
+    data = data.sort_index()
+    bundle = joblib.load(path)
+    ranker, scaler, feature_names = bundle["ranker"], bundle["scaler"], bundle["feature_names"]
+    train, val = _rolling_split(data, bundle["last_trained_date"], val_dates)
+    if train.empty:
+        return {"mode": "unchanged", "seconds": time.perf_counter() - tic}
+
+    new = data[data.index > bundle["last_trained_date"]]
+    drift = float(psi(scaler.transform(new[feature_names].to_numpy()), bundle["reference"]).mean())
+    unchanged = bundle.get("unchanged", 0)
+    if drift > drift_threshold or unchanged >= max_unchanged:
+        report = full_refit(data, path, bundle["params"], val_dates, eval_at, stopping_rounds)
+        report.update(drift=drift, unchanged=unchanged)
+        return report
+
+    X_train = scaler.transform(train[feature_names].to_numpy())
+
+    X_val = scaler.transform(val[feature_names].to_numpy())
+    y_val, group_val = val[LABEL].to_numpy(), query_groups(val)
+    ndcg_before = ndcg_at_k(y_val, ranker.predict(X_val), group_val, eval_at)
+
+    booster = ranker.booster_
+    n_trees_before = booster.current_iteration()
+    warm = _fit(
+        lightgbm.LGBMRanker(**{**bundle["params"], "n_estimators": max_new_trees}),
+        X_train, train[LABEL].astype(int), query_groups(train),
+        X_val, y_val.astype(int), group_val,
+        eval_at, stopping_rounds, init_model=booster
+    )
+    ndcg_after = ndcg_at_k(y_val, warm.predict(X_val), group_val, eval_at)
+
+    report = {"drift": drift, "ndcg_before": ndcg_before, "ndcg_after": ndcg_after, "trees_added": 0}
+    state = {key: value for key, value in bundle.items() if key not in ["ranker", "scaler", "feature_names"]}
+    if ndcg_after > ndcg_before:
+        # drop the trees grown after the best validation iteration
+        best = warm.booster_.best_iteration or warm.booster_.current_iteration()
+        warm.booster_.model_from_string(warm.booster_.model_to_string(num_iteration=best))
+        state.update(last_trained_date=train.index[-1], unchanged=0)
+        save_artifacts(warm, scaler, path, feature_names=feature_names, **state)
+        report.update(mode="incremental", trees_added=best - n_trees_before)
+    else:
+        # keep the saved model; these groups are retried at the next update,
+        # until `max_unchanged` misses force a full refit
+        state["unchanged"] = unchanged + 1
+        save_artifacts(ranker, scaler, path, feature_names=feature_names, **state)
+        report.update(mode="unchanged", unchanged=state["unchanged"])
+
+    report["seconds"] = time.perf_counter() - tic
+    return report
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import numpy as np
+import pandas as pd
+
+"""
+Single-Solve Multi-Target Linear Regression
+
+One factorization of the design [1, X] is shared by every target column,
+so choosing the best RtR target costs one fit instead of one per target.
+"""
+def fit_linear_multi(X, Y):
+    """
+    Least squares for all targets at once. Returns (p + 1, n_targets) coefficients
+    (intercept first), same solution as LinearRegression().fit(X, Y).
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    x_mean, y_mean = X.mean(axis=0), Y.mean(axis=0)
+    coef, *_ = np.linalg.lstsq(X - x_mean, Y - y_mean, rcond=None)
+    return np.vstack([y_mean - x_mean @ coef, coef])
+
+def predict_linear_multi(coef, X):
+    return coef[0] + np.asarray(X, dtype=float) @ coef[1:]
+
+def r2_scores(Y_true, Y_pred):
+    """
+    Column-wise R^2 (as `score` of each single-target regressor)
+    """
+    Y_true = np.asarray(Y_true, dtype=float)
+    sse = ((Y_true - Y_pred)**2).sum(axis=0)
+    sst = ((Y_true - Y_true.mean(axis=0))**2).sum(axis=0)
+    return 1 - sse/sst
+
+def target_scores(X_train, y_train, X_test, y_test):
+    """
+    Out-of-sample R^2 per candidate target (replaces the `for target in y_train.columns` loop)
+    """
+    coef = fit_linear_multi(X_train, y_train)
+    scores = r2_scores(y_test, predict_linear_multi(coef, X_test))
+    return pd.DataFrame({"R2": scores}, index=list(y_train.columns))
+
+"""
+Multi-Output Nonlinear Heads
+"""
+def fit_mlp_multi(X, Y, **kwargs):
+    """
+    One MLPRegressor with a head per target, trained in a single pass
+    """
+    from sklearn.neural_network import MLPRegressor
+    mlp = MLPRegressor(**kwargs)
+    mlp.fit(X, np.asarray(Y, dtype=float))
+    return mlp
+
+"""
+Cross-Sectional Relevances
+"""
+def relevance_buckets(predictions, q=5):
+    """
+    Per-date quantile buckets [0, q-1] for every prediction column together.
+    Same labels as `wide.apply(pd.qcut, q=q, labels=False, axis=1)` on each target,
+    without pivoting. `predictions`: tidy frame indexed by Date, one column per target.
+    """
+    by_date = predictions.groupby(level=0)
+    ranks = by_date.rank(method="first") - 1
+    counts = by_date.transform("count") - 1
+    # qcut edges sit at rank (counts * i/q): bucket = ceil(q*rank/counts) - 1, lowest included
+    buckets = -(-q*ranks // counts) - 1
+    return buckets.clip(lower=0).astype("Int8")
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
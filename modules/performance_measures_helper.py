@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import pandas as pd
 import numpy as np
-import riskfolio.RiskFunctions as rf
 
 scalers = {
     "daily": 252,
@@ -10,6 +9,13 @@ scalers = {
     "biweekly": 25
 }
 
+def _rf():
+    """
+    Deferred riskfolio import (heavy). Only PMs built on RiskFunctions pay for it.
+    """
+    import riskfolio.RiskFunctions as rf
+    return rf
+
 """ 
 Performance Measures Related Functions
 """
@@ -56,10 +62,12 @@ def var_ratio(y, quant=0.05):
 
 # riskfolio.RiskFunctions efficient implementations
 def rf_var_ratio(y, alpha=0.05):
+    rf = _rf()
     varratio = rf.VaR_Hist(y,1-alpha)/rf.VaR_Hist(y,alpha) 
     return varratio
 
 def rachev_ratio(y, alpha=0.05):
+    rf = _rf()
     rratio = rf.CVaR_Hist(y,1-alpha)/rf.CVaR_Hist(y,alpha)
     return rratio
 
@@ -69,6 +77,7 @@ def leon_sortino_ratio(y, freq="daily"):
     """
     Leon Trick for the Sortino Ratio
     """
+    rf = _rf()
     if y.mean()<0:
         return np.power(scalers[freq],1.5) *(y.mean()*rf.LPM(y,MAR=0,p=2))
     else:
@@ -78,6 +87,7 @@ def omega_ratio(y):
     """
     Omega Ratio 
     """
+    rf = _rf()
     return 1+y.mean()/rf.LPM(y,MAR=0,p=1)
 
 """ 
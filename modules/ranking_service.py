@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+NON_FEATURES = ["symbols", "observed_rank"]
+ABNORMAL_PMS = ["VARR1M90", "VARR1M80"] # Dropped before training (see LambdaMART notebook)
+
+"""
+Artifacts (Ranker + Scaler)
+"""
+def save_artifacts(ranker, scaler, path, feature_names=None, **state):
+    """
+    Dumps fitted LGBMRanker and RobustScaler in a single joblib bundle
+    (plus any retraining state, see incremental_ranker)
+    """
+    joblib.dump({"ranker": ranker, "scaler": scaler, "feature_names": feature_names, **state}, path)
+
+def load_features(path):
+    """
+    Tidy features file (Date index, `symbols` column, one column per PM)
+    """
+    return pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+
+def topk_weights(ranking, k=3):
+    """
+    Equally weighted Long Top-k allocation
+    """
+    if not 1 <= k <= len(ranking):
+        raise ValueError(f"k must be between 1 and {len(ranking)}")
+    return {symbol: 1/k for symbol in ranking[:k]}
+
+"""
+Resident Ranking Service
+"""
+class RankingService:
+    """
+    Keeps ranker, scaler and the scaled feature cross-sections in memory,
+    so scoring a single day is one small `predict` call.
+    """
+    def __init__(self, artifacts_path, features_path, latency_window=10000):
+        bundle = joblib.load(artifacts_path)
+        self.ranker = bundle["ranker"]
+        self.scaler = bundle["scaler"]
+        self.feature_names = bundle.get("feature_names")
+        if self.feature_names is None:
+            self.feature_names = getattr(self.scaler, "feature_names_in_", None)
+        self.features_path = features_path
+        self.latencies = deque(maxlen=latency_window)
+        self.reload_features()
+
+    def reload_features(self):
+        """
+        (Re)loads the feature store and caches one scaled cross-section per date
+        """
+        features = load_features(self.features_path).sort_index()
+        if self.feature_names is None:
+            self.feature_names = [
+                col for col in features.columns if col not in NON_FEATURES + ABNORMAL_PMS
+            ]
+        X = self.scaler.transform(features[list(self.feature_names)].to_numpy())
+        symbols = features["symbols"].to_numpy()
+        dates = features.index
+        # contiguous blocks per date (index is sorted)
+        bounds = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(dates)]])
+        cross_sections = {
+            dates[s]: (symbols[s:e], np.ascontiguousarray(X[s:e])) for s, e in zip(starts, ends)
+        }
+        # single assignment: scoring threads see either the old or the new snapshot
+        self.snapshot = (cross_sections, pd.DatetimeIndex(sorted(cross_sections)))
+
+    @property
+    def latest(self):
+        return self.snapshot[1][-1]
+
+    @staticmethod
+    def _resolve(dates, date):
+        # last available cross-section on or before `date`
+        if date is None:
+            return dates[-1]
+        pos = dates.searchsorted(pd.Timestamp(date), side="right") - 1
+        if pos < 0:
+            raise KeyError(f"No features on or before {date}")
+        return dates[pos]
+
+    def score_day(self, date=None, k=3):
+        """
+        Ranked currencies (best first) and Top-k weights for a date (latest if None)
+        """
+        tic = time.perf_counter()
+        cross_sections, dates = self.snapshot
+        date = self._resolve(dates, date)
+        symbols, X = cross_sections[date]
+        gains = self.ranker.predict(X, num_threads=1)
+        ranking = symbols[np.argsort(-gains)].tolist()
+        self.latencies.append(time.perf_counter() - tic)
+        return {
+            "date": date.strftime("%Y-%m-%d"),
+            "ranking": ranking,
+            "weights": topk_weights(ranking, k)
+        }
+
+    def score_batch(self, start=None, end=None, k=3):
+        """
+        Historical replay. One `predict` over the stacked cross-sections of the window.
+        """
+        cross_sections, dates = self.snapshot
+        window = dates[(dates >= pd.Timestamp(start or dates[0])) & (dates <= pd.Timestamp(end or dates[-1]))]
+        if len(window) == 0:
+            return []
+        blocks = [cross_sections[d] for d in window]
+        gains = self.ranker.predict(np.vstack([X for _, X in blocks]))
+        results, offset = [], 0
+        for date, (symbols, X) in zip(window, blocks):
+            g = gains[offset:offset + len(X)]
+            offset += len(X)
+            ranking = symbols[np.argsort(-g)].tolist()
+            results.append({
+                "date": date.strftime("%Y-%m-%d"),
+                "ranking": ranking,
+                "weights": topk_weights(ranking, k)
+            })
+        return results
+
+    def latency_report(self):
+        """
+        p50/p99 single-day scoring latency in milliseconds
+        """
+        if not self.latencies:
+            return {"n": 0, "p50_ms": None, "p99_ms": None}
+        lat = 1e3*np.fromiter(self.latencies, dtype=float)
+        return {"n": len(lat), "p50_ms": float(np.percentile(lat, 50)), "p99_ms": float(np.percentile(lat, 99))}
+
+"""
+Local HTTP Interface
+"""
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {key: val[0] for key, val in parse_qs(url.query).items()}
+            try:
+                k = int(q.get("k", 3))
+                if url.path == "/rank":
+                    body = service.score_day(q.get("date"), k=k)
+                elif url.path == "/batch":
+                    body = service.score_batch(q.get("start"), q.get("end"), k=k)
+                elif url.path == "/latency":
+                    body = service.latency_report()
+                elif url.path == "/reload":
+                    self.send_error(405, "Use POST /reload")
+                    return
+                else:
+                    self.send_error(404)
+                    return
+            except (KeyError, ValueError, IndexError) as e:
+                self.send_error(400, str(e))
+                return
+            self._send_json(body)
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/reload":
+                self.send_error(404)
+                return
+            service.reload_features()
+            self._send_json({"latest": service.latest.strftime("%Y-%m-%d")})
+
+        def _send_json(self, body):
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="FX LETOR daily ranking service")
+    parser.add_argument("--artifacts", required=True, help="joblib bundle from save_artifacts")
+    parser.add_argument("--features", required=True, help="tidy features CSV (Date, symbols, PMs)")
+    parser.add_argument("--date", default=None, help="score a single date (default: latest)")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--batch", action="store_true", help="replay [start, end]")
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--serve", action="store_true", help="keep the model resident behind HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    service = RankingService(args.artifacts, args.features)
+
+    if args.serve:
+        ThreadingHTTPServer((args.host, args.port), make_handler(service)).serve_forever()
+    elif args.batch:
+        print(json.dumps(service.score_batch(args.start, args.end, k=args.k)))
+    else:
+        out = service.score_day(args.date, k=args.k)
+        out["latency"] = service.latency_report()
+        print(json.dumps(out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+BUNDLE_FILE = "fx_visor_bundle.npz"
+MAX_AGE_DAYS = 4 # a Friday close is still fresh on Monday
+
+_refreshing = {} # path -> (thread, time of the attempt)
+_refreshed = {} # path -> prices
+_refresh_lock = threading.Lock()
+
+# fallback clock for process_uptime where /proc is not available
+PROCESS_TIC = time.perf_counter()
+
+"""
+Artifact Bundle for the Visors (streamlit/shiny)
+
+Plain .npz (no pickles): loading it only needs numpy + pandas, so the apps
+can boot without yfinance, yaml or matplotlib.
+"""
+def build_bundle(prices, groups, path=BUNDLE_FILE):
+    """
+    prices: wide date x code frame of EUR-based (inverse) rates
+    groups: {region: [codes]} as in config.yaml
+    """
+    prices = prices.sort_index()
+    np.savez_compressed(
+        path,
+        dates=prices.index.to_numpy(dtype="datetime64[D]"),
+        codes=np.array(prices.columns.tolist()),
+        groups=np.array(json.dumps(groups)),
+        prices=prices.to_numpy(dtype=np.float32)
+    )
+
+def load_bundle(path=BUNDLE_FILE):
+    """
+    Returns (prices, groups)
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        index = pd.DatetimeIndex(npz["dates"], name="Date")
+        codes = npz["codes"].tolist()
+        prices = pd.DataFrame(npz["prices"], index=index, columns=codes)
+        groups = json.loads(str(npz["groups"]))
+    return prices, groups
+
+def is_stale(prices, max_age_days=MAX_AGE_DAYS):
+    return pd.Timestamp.today().normalize() - prices.index[-1] > pd.Timedelta(days=max_age_days)
+
+def refresh_in_background(path, groups, retry_after=3600):
+    """
+    Never blocks: starts (at most one per path, and one attempt per `retry_after`
+    seconds) a daemon thread that downloads fresh prices and rewrites the bundle.
+    Meanwhile the apps keep serving the stale bundle; see `refreshed_prices`.
+    """
+    with _refresh_lock:
+        thread, tried = _refreshing.get(path, (None, None))
+        if (thread is not None and thread.is_alive()) or (tried is not None and time.time() - tried < retry_after):
+            return
+        thread = threading.Thread(target=_refresh, args=(path, groups), daemon=True)
+        _refreshing[path] = (thread, time.time())
+    thread.start()
+
+def _refresh(path, groups):
+    try:
+        prices = fetch_prices([code for land in groups for code in groups[land]])
+    except Exception: # Y! down: keep serving the stale bundle, retried later
+        return
+    _refreshed[path] = prices
+    try:
+        build_bundle(prices, groups, path)
+    except OSError: # read-only container: the refreshed prices are kept in memory
+        pass
+
+def refreshed_prices(path):
+    """
+    Prices downloaded by the last background refresh of `path` (None if none yet)
+    """
+    return _refreshed.get(path)
+
+def process_uptime():
+    """
+    Seconds since this process was started (server boot and imports included),
+    from /proc/self/stat. Elsewhere, seconds since the first import of this module.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19]) # field 22: starttime
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks/os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - PROCESS_TIC
+
+def fetch_prices(codes):
+    """
+    EUR-based inverse rates from Y! Finance (EURxxx=X tickers)
+    """
+    import yfinance as yf
+    prices = 1/yf.download(["EUR" + code + "=X" for code in codes])["Close"]
+    prices.columns = [x.replace("EUR","").replace("=X","") for x in prices.columns.tolist()]
+    return prices[codes]
+
+def main():
+    import yaml
+    # rebuild hook: run after the daily catcher, e.g. `python -m modules.visor_artifacts`
+    parser = argparse.ArgumentParser(description="Precompute the visors artifact bundle")
+    parser.add_argument("--config", default="streamlit/config.yaml")
+    parser.add_argument("--out", nargs="+", default=["streamlit/" + BUNDLE_FILE, "shiny/" + BUNDLE_FILE])
+    args = parser.parse_args()
+
+    with open(args.config, "r") as configfile:
+        groups = yaml.safe_load(configfile)["currencies"]
+    codes = [code for land in groups for code in groups[land]]
+    prices = fetch_prices(codes)
+    for path in args.out:
+        build_bundle(prices, groups, path)
+
+if __name__ == "__main__":
+    main()
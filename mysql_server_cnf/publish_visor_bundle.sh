@@ -0,0 +1,19 @@
+#!/usr/bin/env bash
+# Crontab hook, right after fx_catcher.py: rebuilds the visors price bundle,
+# commits the streamlit copy (the hosted streamlit app runs from a clone of
+# the repo) and redeploys the standalone shiny app with its fresh copy.
+# Usage: mysql_server_cnf/publish_visor_bundle.sh [rsconnect deploy options, e.g. --name <account>]
+set -euo pipefail
+
+REPO_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+cd "$REPO_DIR"
+
+python -m modules.visor_artifacts
+
+git add streamlit/fx_visor_bundle.npz
+if ! git diff --cached --quiet -- streamlit/fx_visor_bundle.npz; then
+    git commit -m "Refresh visor price bundle" -- streamlit/fx_visor_bundle.npz
+    git push
+fi
+
+shiny/deploy.sh "$@"
@@ -0,0 +1,18 @@
+#!/usr/bin/env bash
+# Stages the standalone shinyapps.io bundle: the app plus the shared visor
+# helpers from modules/ (bundle loader and chart rendering), then deploys it.
+# Usage: shiny/deploy.sh [rsconnect deploy options, e.g. --name <account>]
+set -euo pipefail
+
+REPO_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+STAGE_DIR="$(mktemp -d)"
+trap 'rm -rf "$STAGE_DIR"' EXIT
+
+cp "$REPO_DIR"/shiny/{fx_shiny_visor.py,config.yaml,requirements.txt} "$STAGE_DIR"/
+if [ -f "$REPO_DIR/shiny/fx_visor_bundle.npz" ]; then
+    cp "$REPO_DIR/shiny/fx_visor_bundle.npz" "$STAGE_DIR"/
+fi
+mkdir "$STAGE_DIR/modules"
+cp "$REPO_DIR"/modules/{visor_artifacts.py,chart_rendering.py} "$STAGE_DIR/modules"/
+
+rsconnect deploy shiny "$STAGE_DIR" --entrypoint fx_shiny_visor:app --title fx_shinyvisor "$@"
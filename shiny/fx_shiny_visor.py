@@ -1,26 +1,50 @@
 from shiny import *
 from shiny.types import FileInfo
 import os
+import sys
 import numpy as np
 import pandas as pd
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.dates import DateFormatter
-import time
-import yfinance as yf
-import yaml
-
 from pathlib import Path
 
 from datetime import datetime, timedelta
 
+# modules/ sits next to the app once staged by deploy.sh, one level up in the repo
+APP_DIR = Path(__file__).resolve().parent
+sys.path.extend([str(APP_DIR), str(APP_DIR.parent)])
+from modules.visor_artifacts import BUNDLE_FILE, is_stale, process_uptime, load_bundle, refresh_in_background, refreshed_prices
+from modules.chart_rendering import new_figure, plot_lines, style_wealth_axis, cached_render
+
 CONFIG_FILE = "./config.yaml"
+BUNDLE_PATH = "./" + BUNDLE_FILE # built offline by modules/visor_artifacts.py
+PPI = 96 # render.plot default: figure of width/PPI inches saved at PPI*pixelratio dpi
+
+# heavy imports (yaml, yfinance, matplotlib) are deferred until first use
+bundle = {"prices": None, "groups": None, "source": "Y! Finance"}
+if os.path.exists(BUNDLE_PATH):
+    bundle["prices"], bundle["groups"] = load_bundle(BUNDLE_PATH)
+    bundle["source"] = "bundle"
+
+def bundle_prices():
+    # never blocks: a stale bundle is served (and flagged) while refreshed in background
+    fresh = refreshed_prices(BUNDLE_PATH)
+    if fresh is not None:
+        bundle["prices"], bundle["source"] = fresh, "Y! Finance"
+    if is_stale(bundle["prices"]):
+        refresh_in_background(BUNDLE_PATH, bundle["groups"])
+    return bundle["prices"]
+
+if bundle["prices"] is not None:
+    bundle_prices()
 
 # static fun
 def config():
-        with open(CONFIG_FILE,"r") as configfile:
-            cfg=yaml.safe_load(configfile)
+        if bundle["groups"] is not None:
+            cfg = {"currencies": bundle["groups"]}
+        else:
+            import yaml
+            with open(CONFIG_FILE,"r") as configfile:
+                cfg=yaml.safe_load(configfile)
         
         countries = list()
         
@@ -66,6 +90,7 @@ app_ui = ui.page_fluid(
         ),
         ui.output_ui("target_vol"),                          
         ui.output_ui("target_vol_text"),
+        ui.output_ui("data_status"),
         #ui.input_action_button("go", "Submit Changes", class_="btn-success")
         ),
         ui.panel_main(
@@ -134,6 +159,9 @@ def server(input, output, session):
 
     @reactive.Calc
     def fetch_and_clean():                
+        if bundle["prices"] is not None:
+            return bundle_prices()[list(input.symbols())].dropna(how="any")
+        import yfinance as yf
         tickers = ["EUR"+currency+"=X" for currency in input.symbols()]        
         df = 1/yf.download(tickers)["Close"].dropna(how="any")
         if len(input.symbols())==1:
@@ -195,20 +223,41 @@ def server(input, output, session):
     def iv_port_cumret():        
         weighted_returns = iv_factor_weigths().values.reshape(-1,1).T*raw_px().pct_change().fillna(0)
         return 10000*(1+weighted_returns.mean(axis=1)).cumprod()
+
+    # cache key of rendered charts: (chart, symbols, date range, blending scheme, target vol)
+    def render_key(chart):
+        vol = input.port_vol() if input.blending_type()=="iv" else None
+        return (chart, tuple(input.symbols()), tuple(input.date_range()), input.blending_type(), vol)
+
+    # css size and pixel ratio of a plot output, as render.plot will draw it
+    def output_size(id):
+        width = input[f".clientdata_output_{id}_width"]()
+        height = input[f".clientdata_output_{id}_height"]()
+        return max(width, 1), max(height, 1), input[".clientdata_pixelratio"]()
+
+    # figure at its real device size, so lines are downsampled to the drawn pixels
+    def sized_figure(size):
+        width, height, pixelratio = size
+        return new_figure(figsize=(width/PPI, height/PPI), dpi=PPI*pixelratio)
     
     @output
     @render.plot
     #@reactive.event(input.go)
     def plot_undiv():
 
-        _, ax = plt.subplots()        
-        
-        ax.plot(normalized_px())
-        plt.tick_params(rotation=45)
-        ax.xaxis.set_major_formatter(DateFormatter('%Y-%b'))
-        ax.set_ylabel("Cumulative Wealth (€)")
-        ax.legend(normalized_px().columns.tolist(),frameon=False)
-        plt.grid(visible=True, axis='y')         
+        size = output_size("plot_undiv")
+
+        def draw():
+            fig, ax = sized_figure(size)
+            plot_lines(ax, normalized_px())
+            style_wealth_axis(ax)
+            ax.legend(normalized_px().columns.tolist(),frameon=False)
+            return fig
+
+        return cached_render(
+            ("undiv", tuple(input.symbols()), tuple(input.date_range()), size),
+            draw
+        )
        
     @output
     @render.ui
@@ -238,6 +287,16 @@ def server(input, output, session):
         )
         return None
 
+    @output
+    @render.ui
+    def data_status():
+        last = fetch_and_clean().index[-1]
+        stale = bundle["prices"] is not None and is_stale(bundle["prices"])
+        return ui.markdown(
+            f"Prices as of {last:%Y-%m-%d} ({bundle['source']})"
+            + (". **Stale**, refreshing in background" if stale else "")
+        )
+
     @output
     @render.ui
     def text_div():
@@ -254,22 +313,24 @@ def server(input, output, session):
     @render.plot
     #@reactive.event(input.go)
     def plot_div():        
+        size = output_size("plot_div")
 
-        _, ax = plt.subplots()                       
+        def draw():
+            fig, ax = sized_figure(size)
 
-        if input.blending_type()=="ew":
-            ax.plot(normalized_px(), alpha=0.15)
-            ax.plot(ew_port_cumret(), color="black")        
-        else:            
-            ax.plot(normalized_px(), alpha=0.075)
-            ax.plot(ew_port_cumret(), color="black", linestyle="dashdot", alpha=0.36, label="Equally Weighted")
-            ax.plot(iv_port_cumret(), color="black", label="Volatility Targetting")            
-            ax.legend(frameon=False)        
-        
-        plt.tick_params(rotation=45)
-        ax.xaxis.set_major_formatter(DateFormatter('%Y-%b'))
-        ax.set_ylabel("Cumulative Wealth (€)")
-        plt.grid(visible=True, axis='y')
+            if input.blending_type()=="ew":
+                plot_lines(ax, normalized_px(), alpha=0.15)
+                plot_lines(ax, ew_port_cumret(), color="black")        
+            else:            
+                plot_lines(ax, normalized_px(), alpha=0.075)
+                plot_lines(ax, ew_port_cumret(), color="black", linestyle="dashdot", alpha=0.36, label="Equally Weighted")
+                plot_lines(ax, iv_port_cumret(), color="black", label="Volatility Targetting")            
+                ax.legend(frameon=False)        
+            
+            style_wealth_axis(ax)
+            return fig
+
+        return cached_render(render_key("div") + (size,), draw)
 
     @output
     @render.table
@@ -301,6 +362,9 @@ def server(input, output, session):
     @render.plot
     #@reactive.event(input.go)
     def pie_alloc_div():
+        return cached_render(render_key("pie"), draw_pie)
+
+    def draw_pie():
         omega=iv_factor_weigths()
         y_fx = omega.values/len(omega)
         y = np.append(y_fx,1-np.sum(y_fx))
@@ -313,7 +377,7 @@ def server(input, output, session):
         if input.blending_type()=="iv":
             curncies.extend(["EUR"])              
 
-        _, ax = plt.subplots(figsize=(10,7))
+        fig, ax = new_figure(figsize=(10,7))
 
         explode_ = [0]*len(curncies)
         
@@ -326,6 +390,9 @@ def server(input, output, session):
             explode=explode_,
             shadow=True,            
         )
+        return fig
+
 
+app = App(app_ui, server)
 
-app = App(app_ui, server)
\ No newline at end of file
+print(f"FX ShinyVisor ready {process_uptime():.2f}s after process start ({bundle['source']})")
\ No newline at end of file
@@ -1,49 +1,77 @@
 import streamlit as st
 import os
+import sys
+import time
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.dates import DateFormatter
-import time
-
-import yfinance as yf
-import yaml
 
 from datetime import datetime, timedelta
 
-plt.style.use("fast")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.visor_artifacts import BUNDLE_FILE, is_stale, process_uptime, load_bundle, refresh_in_background, refreshed_prices
+from modules.chart_rendering import new_figure, plot_lines, style_wealth_axis, figure_png, cached_render
 
 PATH_STREAMLIT_APP = "/app/fx_letor/streamlit/"
 CONFIG_FILE = "config.yaml"
 FULLPATH_CONFIG_FILE = PATH_STREAMLIT_APP + CONFIG_FILE
-
-try:
-    with open(FULLPATH_CONFIG_FILE,"r") as configfile:
-        cfg=yaml.safe_load(configfile)
-except:
-    with open(CONFIG_FILE,"r") as configfile:
-        cfg=yaml.safe_load(configfile)
-
-countries = list()
-for land in cfg["currencies"].keys():
-    countries.extend(cfg["currencies"][land])
-
-tickers = ["EUR"+currency+"=X" for currency in countries]
+RENDER_DPI = 200 # st.pyplot default: same chart resolution as before
+
+# heavy imports (yaml, yfinance, matplotlib) are deferred until first use
+def load_config():
+    import yaml
+    try:
+        with open(FULLPATH_CONFIG_FILE,"r") as configfile:
+            cfg=yaml.safe_load(configfile)
+    except:
+        with open(CONFIG_FILE,"r") as configfile:
+            cfg=yaml.safe_load(configfile)
+    return cfg["currencies"]
 
 # caching full-data for optimized responsiveness
+@st.cache(allow_output_mutation=True, ttl=6*3600)
+def load_data(path):
+    return load_bundle(path)
+
 @st.cache
 def fetch_and_clean(tickers):
+    import yfinance as yf
     return 1/yf.download(tickers)["Close"].dropna(how="any")
 
-# A convenient way for rendering decorators and enhancing effects
-def rendering():
-    with st.spinner("Rendering..."):
-        time.sleep(0.25)
+# cold start: process start (server boot included) to its first script run, not each rerun
+@st.cache
+def startup_secs():
+    return process_uptime()
+
+bundle_path = next(
+    (path for path in [PATH_STREAMLIT_APP + BUNDLE_FILE, BUNDLE_FILE] if os.path.exists(path)),
+    None
+)
+
+if bundle_path is not None:
+    # never blocks: a stale bundle is served (and flagged) while refreshed in background
+    fx_prices, groups = load_data(bundle_path)
+    source = "bundle"
+    if refreshed_prices(bundle_path) is not None:
+        fx_prices, source = refreshed_prices(bundle_path), "Y! Finance"
+    stale = is_stale(fx_prices)
+    if stale:
+        refresh_in_background(bundle_path, groups)
+else:
+    groups = load_config()
+    source = "Y! Finance"
+    stale = False
+
+countries = list()
+for land in groups.keys():
+    countries.extend(groups[land])
 
-#adhoc renaming for plotting
-fx_prices = fetch_and_clean(tickers)
-fx_prices.columns = [x.replace("EUR","").replace("=X","") for x in fx_prices.columns.tolist()]
+if bundle_path is not None:
+    fx_prices = fx_prices[countries].dropna(how="any")
+else:
+    tickers = ["EUR"+currency+"=X" for currency in countries]
+    #adhoc renaming for plotting
+    fx_prices = fetch_and_clean(tickers)
+    fx_prices.columns = [x.replace("EUR","").replace("=X","") for x in fx_prices.columns.tolist()]
 
 # max time-window
 ts_min, ts_max = fx_prices.index[0], fx_prices.index[-1]
@@ -98,6 +126,12 @@ with st.sidebar:
         st.success("Succesfully Updated",icon="💸")
     else:
         st.warning("Awaiting Submit Button...",icon="⌛")
+
+    st.caption(
+        f"Prices as of {fx_prices.index[-1]:%Y-%m-%d} ({source})"
+        + (". **Stale**, refreshing in background" if stale else "")
+        + f". Cold start {startup_secs():.2f}s"
+    )
         
 # Common DataFrames
 norm_fx_px = 10000*fx_prices[start_date:end_date][symbols]/fx_prices[start_date:end_date][symbols].iloc[0,:]
@@ -111,19 +145,19 @@ with tab1:
     st.header("Nondiversified")    
 
     if refreshed:
-        rendering()
-        fig, ax = plt.subplots()
-        ax.plot(norm_fx_px)
-        #ax.plot(sdata_yearacum[cities])
-        plt.tick_params(rotation=45)
-        ax.xaxis.set_major_formatter(DateFormatter('%Y-%b'))
-        ax.set_ylabel("Cumulative Wealth (€)")
-        ax.legend(symbols, frameon=False)
-        plt.grid(visible=True, axis='y')
+        def draw_undiv():
+            fig, ax = new_figure(dpi=RENDER_DPI)
+            plot_lines(ax, norm_fx_px)
+            style_wealth_axis(ax)
+            ax.legend(symbols, frameon=False)
+            return figure_png(fig, dpi=RENDER_DPI)
+
+        with st.spinner("Rendering..."):
+            png = cached_render(("undiv", tuple(symbols), start_date, end_date), draw_undiv)
         # st decorations
         st.markdown("#### Hypothetical Growth of 10,000€")
         st.write("Individual (nondiversified) growth for each currency chosen.")
-        st.pyplot(fig)        
+        st.image(png)
 
 with tab2:
     st.header("Diversified")    
@@ -132,22 +166,23 @@ with tab2:
     if refreshed:          
         # Solomonic Blending
         fx_port_cumret = 10000*(1+norm_fx_px.pct_change().mean(axis=1)).cumprod()        
-        fig, ax = plt.subplots()        
-        rendering()
         if ew:                               
             with col1:                
                 # EW Blending
-                ax.plot(norm_fx_px, alpha=0.15)
-                ax.plot(fx_port_cumret, color="black")
-                plt.tick_params(rotation=45)
-                ax.xaxis.set_major_formatter(DateFormatter('%Y-%b'))
-                ax.set_ylabel("Cumulative Wealth (€)")
-                plt.grid(visible=True, axis='y')
+                def draw_ew():
+                    fig, ax = new_figure(dpi=RENDER_DPI)
+                    plot_lines(ax, norm_fx_px, alpha=0.15)
+                    plot_lines(ax, fx_port_cumret, color="black")
+                    style_wealth_axis(ax)
+                    return figure_png(fig, dpi=RENDER_DPI)
+
+                with st.spinner("Rendering..."):
+                    png = cached_render(("div", tuple(symbols), start_date, end_date, "ew", None), draw_ew)
                             
                 st.markdown("#### Hypothetical Growth of 10,000€")                            
                 curncy_components = f'{", ".join(symbols)}'            
                 st.markdown(f"{opciones} Portfolio composed by " + curncy_components)
-                st.pyplot(fig)        
+                st.image(png)
             with col2:                
                 st.markdown(f"#### Total Return")
                 st.metric(
@@ -157,25 +192,29 @@ with tab2:
                 )        
         else:   # Invers-Vol Blending                     
             with col1:                                
+                render_key = ("div", tuple(symbols), start_date, end_date, "iv", target_vol)
                 target_vol/=np.sqrt(252)
                 factors = target_vol/fx_px.pct_change().std()
                 factors[factors>1]=1 #DKK patology (pegged to EUR). It acts as a risk-free currency ~EUR
                 weighted_returns = factors.values.reshape(-1,1).T*fx_px.pct_change()
                 fx_iv_port_cumret = 10000*(1+weighted_returns.mean(axis=1)).cumprod()
 
-                ax.plot(norm_fx_px, alpha=0.075)
-                ax.plot(fx_port_cumret, color="gray", linestyle="dotted", alpha=0.45, label="Equally Weighted")
-                ax.plot(fx_iv_port_cumret, color="black", label="Volatility Targetting")
-                plt.tick_params(rotation=45)
-                ax.xaxis.set_major_formatter(DateFormatter('%Y-%b'))
-                ax.set_ylabel("Cumulative Wealth (€)")
-                plt.grid(visible=True, axis='y')
-                ax.legend(frameon=False)
+                def draw_iv():
+                    fig, ax = new_figure(dpi=RENDER_DPI)
+                    plot_lines(ax, norm_fx_px, alpha=0.075)
+                    plot_lines(ax, fx_port_cumret, color="gray", linestyle="dotted", alpha=0.45, label="Equally Weighted")
+                    plot_lines(ax, fx_iv_port_cumret, color="black", label="Volatility Targetting")
+                    style_wealth_axis(ax)
+                    ax.legend(frameon=False)
+                    return figure_png(fig, dpi=RENDER_DPI)
+
+                with st.spinner("Rendering..."):
+                    png = cached_render(render_key, draw_iv)
             
                 st.markdown("#### Hypothetical Growth of 10,000€")                            
                 curncy_components = f'{", ".join(symbols)}'            
                 st.markdown(f"{opciones} Portfolio composed by " + curncy_components)
-                st.pyplot(fig)
+                st.image(png)
             with col2:                
                 st.markdown(f"#### Total Return")
                 st.metric(